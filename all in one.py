@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import csv
-import gzip
 import io
+import json
 import os
 import re
+import shutil
 import sys
-import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import requests
+
+# ISA-L (SIMD-ускоренный inflate) ~2x быстрее stdlib gzip; ставится как
+# `pip install isal`, при отсутствии — обычный gzip
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+# google-re2 (`pip install google-re2`): DFA без бэктрекинга, маски с кучей
+# альтернатив ('mebel|шкаф|...') матчит за один проход; без него — stdlib re
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# blake3 (`pip install blake3`) — быстрый хэш для проверки «архив не
+# изменился»; без него — blake2b из stdlib (тот же API)
+try:
+    from blake3 import blake3 as _new_hasher
+except ImportError:
+    from hashlib import blake2b as _new_hasher
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
@@ -22,8 +49,8 @@ from urllib3.util.retry import Retry
 # ------------------------
 
 BASE_DIR = Path(__file__).resolve().parent
-ALL_DOMAINS_FILE = BASE_DIR / "all_domains.csv"   # TSV с таб-разделителем
-RESULT_FILE      = BASE_DIR / "result.csv"        # TSV с таб-разделителем
+ALL_DOMAINS_FILE = BASE_DIR / "all_domains"  # каталог parquet-частей (zstd), по одной на архив
+RESULT_FILE      = BASE_DIR / "result.csv"   # TSV с таб-разделителем
 
 # Наборы источников .gz. Скрипт попробует пройтись по каждому словарю по очереди.
 SOURCES = [
@@ -47,8 +74,16 @@ SOURCES = [
 
 HEADER = ["domain", "registered", "date_created", "paid_till", "date_free", "delegated"]
 
+DATE_FORMAT = "%d.%m.%Y"  # формат дат в файлах зон (dd.mm.yyyy)
+DATE_FREE_COL = HEADER.index("date_free")
+
+SCHEMA = pa.schema([(col, pa.string()) for col in HEADER])
+
 UA = "Mozilla/5.0 (all-in-one-domains-script)"
 TIMEOUT = 60
+DOWNLOAD_WORKERS = 8  # параллельные скачивания (I/O-bound)
+POOL_SIZE = 32  # соединений в пуле на хост — с запасом над числом воркеров
+READ_BUFFER_SIZE = 128 * 1024  # буфер чтения поверх GzipFile
 
 
 # ------------------------
@@ -64,8 +99,15 @@ def make_session():
         allowed_methods=frozenset(["GET"]),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retries, pool_connections=10, pool_maxsize=10)
-    s.headers.update({"User-Agent": UA, "Accept": "*/*"})
+    adapter = HTTPAdapter(
+        max_retries=retries,
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        pool_block=False,
+    )
+    # Accept-Encoding: identity — чтобы сервер не заворачивал .gz в ещё один
+    # слой сжатия, который стек requests/urllib3 прозрачно распаковывал бы
+    s.headers.update({"User-Agent": UA, "Accept": "*/*", "Accept-Encoding": "identity"})
     s.mount("http://", adapter)
     s.mount("https://", adapter)
     return s
@@ -78,100 +120,333 @@ SESSION = make_session()
 # Загрузка и распаковка
 # ------------------------
 
-def fetch_gz(url: str) -> io.BytesIO:
-    """Скачать .gz и вернуть BytesIO (в памяти)."""
-    r = SESSION.get(url, timeout=TIMEOUT, stream=True)
-    r.raise_for_status()
-    buf = io.BytesIO(r.content)
-    return buf
+def download_gz(url: str, spool_path: Path, etag: str = None, last_modified: str = None):
+    """Скачать .gz целиком во временный файл (выполняется в потоке-воркере).
+
+    С валидаторами etag/last_modified шлётся условный GET; на 304 (архив не
+    менялся, тела нет) возвращается None, иначе — заголовки ответа.
+
+    Тело сливаем в файл прямо в воркере, а не отдаём поток наружу: так все
+    архивы качаются действительно одновременно, и открытые соединения не
+    висят в ожидании, пока главный поток дочитает предыдущие (иначе сервер
+    успевает закрыть их по idle-таймауту).
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with SESSION.get(url, timeout=TIMEOUT, stream=True, headers=headers) as r:
+        r.raise_for_status()
+        if r.status_code == 304:
+            return None
+        # тело забираем как есть (сжатым) — распакуем уже при разборе
+        r.raw.decode_content = False
+        try:
+            with open(spool_path, "wb") as f:
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+        except Exception:
+            spool_path.unlink(missing_ok=True)
+            raise
+        return r.headers
+
+
+def _file_digest(path: Path) -> str:
+    """Hex-дайджест файла (blake3, либо blake2b из stdlib)."""
+    hasher = _new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _tsv_options():
+    """Опции разбора исходного TSV для Arrow (битые строки пропускаем)."""
+    return dict(
+        read_options=pacsv.ReadOptions(column_names=HEADER),
+        parse_options=pacsv.ParseOptions(delimiter="\t", invalid_row_handler=lambda _row: "skip"),
+        convert_options=pacsv.ConvertOptions(column_types={col: pa.string() for col in HEADER}),
+    )
 
 
-def append_gz_tsv_to_file(gz_bytes: io.BytesIO, out_path: Path):
-    """Прочитать gz как TSV и дописать строки в файл."""
-    with gzip.GzipFile(fileobj=gz_bytes) as gz, open(out_path, "a", encoding="utf-8", newline="") as res:
-        writer = csv.writer(res, delimiter="\t")
-        for raw_line in gz:
-            line = raw_line.decode("utf-8", errors="ignore").strip()
-            if not line:
-                continue
-            writer.writerow(line.split("\t"))
+def append_gz_tsv_to_writer(stream, writer: pq.ParquetWriter, days: int = None) -> int:
+    """Распаковать gz-поток (уже готовый TSV) и дописать строки в parquet.
+
+    Если задан days, строки фильтруются прямо при распаковке: остаются только
+    домены, до освобождения которых меньше days дней. Так итоговый файл не
+    раздувается строками, которые фильтр всё равно выбросит.
+    Возвращает число дописанных строк.
+
+    Весь горячий путь (токенизация TSV, strptime, сравнение, выборка) идёт
+    батчами через компилированные ядра Arrow — Python-цикла по строкам нет.
+    """
+    gz = io.BufferedReader(gzip.GzipFile(fileobj=stream), buffer_size=READ_BUFFER_SIZE)
+    cutoff = None
+    if days is not None:
+        cutoff = pa.scalar(datetime.fromordinal(datetime.today().toordinal() + days), type=pa.timestamp("s"))
+    rows = 0
+    with gz:
+        reader = pacsv.open_csv(gz, **_tsv_options())
+        for batch in reader:
+            if cutoff is not None:
+                free_ts = pc.strptime(batch.column(DATE_FREE_COL), format=DATE_FORMAT,
+                                      unit="s", error_is_null=True)
+                # null (непарсибельная дата) отбрасывается вместе с False
+                batch = batch.filter(pc.less(free_ts, cutoff))
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def ingest_gz_to_part(gz_path: Path, part_path: Path, days: int = None) -> int:
+    """Скачанный .gz → parquet-часть. Возвращает число строк."""
+    tmp_path = part_path.with_suffix(".tmp")
+    try:
+        with open(gz_path, "rb") as gz_file, \
+                pq.ParquetWriter(tmp_path, SCHEMA, compression="zstd") as writer:
+            rows = append_gz_tsv_to_writer(gz_file, writer, days=days)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, part_path)
+    return rows
 
 
-def build_all_domains(out_path: Path):
-    """Собрать all_domains.csv из доступных источников (по очереди)."""
-    # обнуляем файл и пишем заголовок
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8", newline="") as res:
-        csv.writer(res, delimiter="\t").writerow(HEADER)
+def _load_meta(meta_path: Path) -> dict:
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_meta(meta_path: Path, meta: dict):
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def base_covers_days(base_dir: Path, days: int) -> bool:
+    """Покрывает ли собранная база запрошенное окно по дням.
+
+    Части, собранные с фильтром days=N, содержат только домены с дропом
+    раньше чем через N дней — для запроса с бОльшим окном такая база даст
+    молча урезанный результат, её надо пересобрать.
+    """
+    meta = _load_meta(base_dir / "_meta.json")
+    if not meta:
+        return True  # нет сведений о сборке — считаем базу полной
+    return all(
+        entry.get("days") is None or entry.get("days") >= days
+        for entry in meta.values()
+    )
+
+
+def build_all_domains(out_dir: Path, days: int = None, use_cache: bool = True):
+    """Собрать базу доменов (каталог parquet-частей) из доступных источников.
+
+    days прокидывается в append_gz_tsv_to_writer: тогда база собирается уже
+    отфильтрованной по дням до освобождения (на порядки меньше и быстрее).
+
+    Для каждого URL в _meta.json хранятся ETag/Last-Modified и дайджест .gz:
+    не изменившиеся с прошлого раза архивы отвечают 304, и их части
+    переиспользуются без скачивания и распаковки. use_cache=False (через
+    --force-update) игнорирует кэш и перекачивает всё.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = out_dir / "_meta.json"
+    meta = _load_meta(meta_path) if use_cache else {}
 
     total_rows = 0
-    for source_idx, links in enumerate(SOURCES, 1):
-        print(f"\nИсточник #{source_idx}: {len(links)} архивов")
-        for zone, url in links.items():
-            try:
-                print(f"  → скачиваю {zone}: {url}")
-                gz_buf = fetch_gz(url)
-                before = out_path.stat().st_size if out_path.exists() else 0
-                append_gz_tsv_to_file(gz_buf, out_path)
-                after = out_path.stat().st_size
-                added_bytes = after - before
-                print(f"    OK (+{added_bytes:,} байт)")
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"    ПРОПУЩЕНО ({zone}): {e.__class__.__name__}: {e}")
-                time.sleep(0.5)
-
-    # Подсчитаем строки
-    try:
-        df = pd.read_csv(out_path, sep="\t", dtype=str, on_bad_lines="skip", low_memory=False)
-        total_rows = len(df)
-    except Exception:
-        pass
-    print(f"\nГотово: {out_path} (строк: {total_rows:,})")
+    # Воркеры параллельно сливают сжатые тела во временные .spool-файлы
+    # (I/O-bound), а распаковка и запись в parquet идут в главном потоке,
+    # по порядку future'ов — поэтому блокировок на writer'ах не нужно.
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        for source_idx, links in enumerate(SOURCES, 1):
+            print(f"\nИсточник #{source_idx}: {len(links)} архивов")
+            jobs = []
+            for zone, url in links.items():
+                safe_zone = re.sub(r"[^\w.-]", "_", zone)
+                part = out_dir / f"part-{source_idx}-{safe_zone}.parquet"
+                spool = out_dir / f".spool-{source_idx}-{safe_zone}.gz"
+                cached = meta.get(url, {})
+                # валидаторы шлём, только если часть на месте и собиралась
+                # с тем же фильтром по дням — иначе 304 нечем заменить
+                validate = part.exists() and cached.get("days") == days
+                jobs.append((zone, url, part, spool, cached, executor.submit(
+                    download_gz, url, spool,
+                    etag=cached.get("etag") if validate else None,
+                    last_modified=cached.get("last_modified") if validate else None,
+                )))
+            for zone, url, part, spool, cached, fut in jobs:
+                try:
+                    resp_headers = fut.result()
+                    if resp_headers is None:
+                        added_rows = cached.get("rows", 0)
+                        print(f"    НЕ ИЗМЕНИЛСЯ ({zone}, 304, {added_rows:,} строк из кэша)")
+                    else:
+                        try:
+                            digest = _file_digest(spool)
+                            # сервер без валидаторов мог отдать 200 на тот же
+                            # архив — дайджест ловит это, и распаковку с
+                            # пересборкой части можно пропустить
+                            if (part.exists() and cached.get("days") == days
+                                    and cached.get("digest") == digest):
+                                added_rows = cached.get("rows", 0)
+                                print(f"    НЕ ИЗМЕНИЛСЯ ({zone}, дайджест совпал, "
+                                      f"{added_rows:,} строк из кэша)")
+                            else:
+                                added_rows = ingest_gz_to_part(spool, part, days=days)
+                                print(f"    OK ({zone}, +{added_rows:,} строк)")
+                        finally:
+                            spool.unlink(missing_ok=True)
+                        meta[url] = {
+                            "etag": resp_headers.get("ETag"),
+                            "last_modified": resp_headers.get("Last-Modified"),
+                            "digest": digest,
+                            "days": days,
+                            "rows": added_rows,
+                        }
+                    total_rows += added_rows
+                except Exception as e:
+                    spool.unlink(missing_ok=True)
+                    if part.exists() and cached.get("days") == days:
+                        added_rows = cached.get("rows", 0)
+                        total_rows += added_rows
+                        print(f"    ОШИБКА ({zone}): {e.__class__.__name__}: {e} — "
+                              f"оставляю кэшированную часть ({added_rows:,} строк)")
+                    else:
+                        part.unlink(missing_ok=True)
+                        meta.pop(url, None)
+                        print(f"    ПРОПУЩЕНО ({zone}): {e.__class__.__name__}: {e}")
+
+    _save_meta(meta_path, meta)
+    if not any(out_dir.glob("*.parquet")):
+        raise RuntimeError("не удалось скачать ни один архив — база не собрана")
+    print(f"\nГотово: {out_dir} (строк: {total_rows:,})")
 
 
 # ------------------------
 # Фильтрация и поиск
 # ------------------------
 
-def normalize_domain(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"^(?:https?://)?(?:www\.)?", "", s)
-    s = s.split("/")[0].split(":")[0]
-    return s
+def parse_zone_dates(s: pd.Series) -> pd.Series:
+    """Распарсить колонку дат из файлов зон.
+
+    Явный format= включает быстрый C-парсер вместо построчного угадывания,
+    cache=True схлопывает одинаковые даты (их масса — домены освобождаются
+    пачками в один день). Если формат вдруг не совпал — откат на медленный
+    автоматический разбор.
+    """
+    parsed = pd.to_datetime(s, format=DATE_FORMAT, errors="coerce", cache=True)
+    if parsed.isna().all() and s.notna().any():
+        parsed = pd.to_datetime(s, dayfirst=True, errors="coerce", cache=True)
+    return parsed
+
+
+def match_mask(s: pd.Series, mask: str) -> np.ndarray:
+    """Булева маска: какие домены подходят под регексп (без учёта регистра)."""
+    # Частый случай — слово или 'слово1|слово2|...' без регексп-метасимволов.
+    # Тогда регексп-движок не нужен: обычный поиск подстроки по каждому
+    # литералу с OR-сведением работает в разы быстрее.
+    literals = mask.split("|")
+    if all(tok and re.escape(tok) == tok for tok in literals):
+        lowered = s.str.lower()
+        hit = np.zeros(len(s), dtype=bool)
+        for tok in literals:
+            hit |= lowered.str.contains(tok.lower(), regex=False, na=False).to_numpy(dtype=bool)
+        return hit
+    if re2 is not None:
+        try:
+            # у google-re2 нет re-style флагов — регистр задаётся через Options
+            opts = re2.Options()
+            opts.case_sensitive = False
+            pat = re2.compile(mask, options=opts)
+        except re2.error:
+            pat = None  # синтаксис не по зубам RE2 (backreferences и т.п.)
+        if pat is not None:
+            arr = s.to_numpy(dtype=object)
+            return np.fromiter((pat.search(d) is not None for d in arr), dtype=bool, count=len(arr))
+    return s.str.contains(mask, flags=re.I, regex=True, na=False).to_numpy(dtype=bool)
+
+
+_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.)?")
+
+
+def normalize_domains(s: pd.Series) -> pd.Series:
+    """Нормализовать колонку доменов целиком.
+
+    Для коротких строк цепочка .str-методов диспатчит по-элементно и плодит
+    промежуточные Series; list comprehension по ndarray с предкомпилированным
+    регекспом здесь ощутимо быстрее.
+    """
+    arr = s.to_numpy(dtype=object)
+    out = [
+        _PREFIX_RE.sub("", d.strip().lower()).split("/", 1)[0].split(":", 1)[0]
+        for d in arr
+    ]
+    return pd.Series(out, index=s.index)
 
 
 def filter_days_and_mask(in_path: Path, out_path: Path, days: int, mask: str):
     """Фильтрация по дням до date_free и маске. Запись result.csv (TSV)."""
-    # читаем TSV, мягко парсим даты
-    df = pd.read_csv(in_path, sep="\t", dtype=str, on_bad_lines="skip", low_memory=False)
+    # база без единой parquet-части (все скачивания сорвались) — отдаём
+    # пустой result.csv, а не криптичную ошибку Arrow
+    if in_path.is_dir() and not any(in_path.glob("*.parquet")):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        columns = ["domain", "date_free", "date_created", "days_left", "domain_age"]
+        out_path.write_text("\t".join(columns) + "\n", encoding="utf-8")
+        print(f"\nБаза пуста — сохранено: {out_path} (строк: 0)")
+        return
+
+    # parquet читается многопоточно и без повторного парсинга текста;
+    # берём только нужные фильтру колонки (projection pushdown), types_mapper
+    # держит строки в Arrow-буферах вместо миллионов Python str
+    df = pq.read_table(in_path, columns=["domain", "date_free", "date_created"]) \
+           .to_pandas(types_mapper=pd.ArrowDtype)
     need_cols = {"domain", "date_free", "date_created"}
     if not need_cols.issubset(set(df.columns)):
         raise ValueError(f"Ожидались колонки {need_cols}, а получили: {list(df.columns)}")
 
-    df["domain"] = df["domain"].astype(str).map(normalize_domain)
-    df["date_free"] = pd.to_datetime(df["date_free"], dayfirst=True, errors="coerce")
-    df["date_created"] = pd.to_datetime(df["date_created"], dayfirst=True, errors="coerce")
+    df["domain"] = normalize_domains(df["domain"].astype(str)).astype("string[pyarrow]")
+    df["date_free"] = parse_zone_dates(df["date_free"])
+    df["date_created"] = parse_zone_dates(df["date_created"])
 
     df = df.dropna(subset=["date_free"])  # без даты освобождения — не фильтруем по дням
 
-    today = pd.Timestamp.today().normalize()
-    df["days_left"] = (df["date_free"] - today).dt.days
-    df = df.loc[df["days_left"] < days].copy()
+    # считаем дни в numpy на датах дневной точности: без промежуточных
+    # Timedelta-Series и в int32 вместо int64
+    today_d = np.datetime64(pd.Timestamp.today().normalize(), "D")
+    free_d = df["date_free"].to_numpy().astype("datetime64[D]")
+    days_left = (free_d - today_d).astype(np.int32)
+    keep = days_left < days
+    df = df.loc[keep]
+    df["days_left"] = days_left[keep]
 
-    # возраст домена
-    df["domain_age"] = (today - df["date_created"]).dt.days
+    # возраст домена (NaT в date_created даёт NaN, как раньше)
+    created_d = df["date_created"].to_numpy().astype("datetime64[D]")
+    df["domain_age"] = (today_d - created_d) / np.timedelta64(1, "D")
 
     # маска/регекс — если пустая, оставляем всё
     if mask.strip():
-        df = df.loc[df["domain"].astype(str).str.contains(mask, flags=re.I, regex=True, na=False)].copy()
+        df = df.loc[match_mask(df["domain"], mask)].copy()
 
-    # сортировка: сначала ближе к освобождению
-    df = df.sort_values(["days_left", "domain"]).reset_index(drop=True)
+    # сортировка: сначала ближе к освобождению (lexsort по int32-ключу
+    # days_left быстрее и экономнее, чем sort_values с копией фрейма)
+    order = np.lexsort((df["domain"].to_numpy(), df["days_left"].to_numpy()))
+    df = df.iloc[order].reset_index(drop=True)
 
-    # сохраняем result.csv (TSV)
+    # сохраняем result.csv (TSV) — пишем через Arrow (многопоточный C++),
+    # а не через построчный DataFrame.to_csv; даты приводим к date32,
+    # чтобы в файле было YYYY-MM-DD без времени
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, sep="\t", index=False)
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    for col in ("date_free", "date_created"):
+        idx = tbl.schema.get_field_index(col)
+        tbl = tbl.set_column(idx, col, tbl.column(col).cast(pa.date32()))
+    # quoting_style="none": голые значения, как писал to_csv (в доменах и
+    # датах не бывает ни табов, ни кавычек)
+    pacsv.write_csv(tbl, out_path,
+                    write_options=pacsv.WriteOptions(delimiter="\t", quoting_style="none"))
 
     print(f"\nСохранено: {out_path} (строк: {len(df):,})")
     if not df.empty:
@@ -197,28 +472,39 @@ def main_cli():
     parser = argparse.ArgumentParser(description="Скачать зоны и отфильтровать домены")
     parser.add_argument("--days", type=int, default=None, help="Фильтр: дней до освобождения (например 30)")
     parser.add_argument("--mask", type=str, default=None, help="Маска/RegEx по домену (например 'mebel|шкаф')")
-    parser.add_argument("--force-update", action="store_true", help="Принудительно пересобрать all_domains.csv")
+    parser.add_argument("--force-update", action="store_true", help="Принудительно пересобрать базу доменов (игнорируя кэш архивов)")
     args = parser.parse_args()
 
+    # если days и mask заданы флагами — работаем без единого input()
+    # (удобно для cron/скриптов); обновление базы тогда только по --force-update
+    non_interactive = args.days is not None and args.mask is not None
+
     need_update = args.force_update
     if not ALL_DOMAINS_FILE.exists() and not need_update:
         need_update = True
 
-    if ALL_DOMAINS_FILE.exists() and not args.force_update:
-        print(f"Найден файл: {ALL_DOMAINS_FILE}")
-        if ask_yes_no("Обновить файл зон сейчас? (YES/NO): "):
+    if ALL_DOMAINS_FILE.exists() and not args.force_update and not non_interactive:
+        print(f"Найдена база: {ALL_DOMAINS_FILE}")
+        if ask_yes_no("Обновить базу зон сейчас? (YES/NO): "):
             need_update = True
 
-    if need_update:
-        print("Собираю all_domains.csv из .gz-архивов...")
-        build_all_domains(ALL_DOMAINS_FILE)
-    else:
-        print("Оставляю текущий all_domains.csv.")
-
-    # параметры фильтрации
+    # параметры фильтрации спрашиваем до сборки: зная days, можно отфильтровать
+    # строки ещё при распаковке и не гонять гигабайты через диск дважды
     days = args.days if args.days is not None else int(input("Enter days left number: ").strip())
     mask = args.mask if args.mask is not None else input("Enter domains search mask (word or RegEx): ").strip()
 
+    # база, собранная с более узким фильтром по дням, не годится для
+    # бОльшего окна — иначе результат будет молча урезан
+    if not need_update and not base_covers_days(ALL_DOMAINS_FILE, days):
+        print(f"База собрана с более узким фильтром по дням — пересобираю под days={days}.")
+        need_update = True
+
+    if need_update:
+        print("Собираю базу доменов из .gz-архивов...")
+        build_all_domains(ALL_DOMAINS_FILE, days=days, use_cache=not args.force_update)
+    else:
+        print("Оставляю текущую базу доменов.")
+
     filter_days_and_mask(ALL_DOMAINS_FILE, RESULT_FILE, days=days, mask=mask)
 
 